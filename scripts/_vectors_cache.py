@@ -0,0 +1,52 @@
+"""
+Session-level cache of the test vectors defined in 'vectors.py'.
+
+The `*_TESTS` groups (`vector_groups.TestGroup` instances) are materialized once
+and pickled next to 'vectors.py'. The pickle is stamped with the mtimes of
+'vectors.py' and 'vector_groups.py' and is rebuilt whenever either changes.
+"""
+import os
+import pickle
+from pathlib import Path
+from types import SimpleNamespace
+
+from vector_groups import TestGroup
+
+TESTS_SUFFIX = '_TESTS'
+
+_SOURCE_PATHS = (Path(__file__).with_name('vectors.py'), Path(__file__).with_name('vector_groups.py'))
+_CACHE_PATH = Path(__file__).with_name('.vectors_cache.pkl')
+
+def _materialize():
+    """Imports 'vectors.py' and collects every `*_TESTS` group."""
+    import vectors
+
+    return {
+        attr_name: getattr(vectors, attr_name)
+        for attr_name in dir(vectors)
+        if attr_name.endswith(TESTS_SUFFIX) and not attr_name.startswith('__')
+        and isinstance(getattr(vectors, attr_name), TestGroup)
+    }
+
+def load_test_sets():
+    """Returns a dict of all `*_TESTS` groups, reading the pickle if it is up to date."""
+    stamp = tuple(path.stat().st_mtime_ns for path in _SOURCE_PATHS)
+    try:
+        with _CACHE_PATH.open('rb') as f:
+            cached_stamp, test_sets = pickle.load(f)
+        if cached_stamp == stamp:
+            return test_sets
+    except (OSError, pickle.UnpicklingError, EOFError, ValueError, AttributeError, ImportError):
+        pass
+
+    test_sets = _materialize()
+    tmp_path = _CACHE_PATH.with_suffix(f'.{os.getpid()}.tmp')
+    try:
+        with tmp_path.open('wb') as f:
+            pickle.dump((stamp, test_sets), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, _CACHE_PATH)
+    except OSError:
+        tmp_path.unlink(missing_ok=True)
+    return test_sets
+
+vectors = SimpleNamespace(**load_test_sets())
@@ -7,22 +7,64 @@ This script analyzes test vectors from 'vectors.py' and automatically
 generates unique Rust structs for each test group (e.g., 'PHASE_TESTS' -> 'PhaseArgs').
 It then creates corresponding generic TestVector<T> static variables.
 """
+import argparse
+import contextlib
+import functools
+import io
 import math
+import os
 import sys
 import subprocess
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from enum import IntEnum
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple, Union
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+from numba import njit, prange
 
 import vectors
+from vector_groups import TestGroup
 
 class RustConstants:
     COMPLEX64, FRAC_1_SQRT_2 = "Complex64", "FRAC_1_SQRT_2"
     ZERO, ONE, I = "ZERO", "ONE", "I"
     FROM, NEW = "from", "new"
 
+class AmplitudeKind(IntEnum):
+    """How an amplitude is rendered in Rust (see `_classify_amplitudes`)."""
+    ZERO, ONE, NEG_ONE, I, NEG_I = range(5)
+    REAL_FRAC, REAL_INT, REAL_FLOAT, COMPLEX = range(5, 9)
+
+@njit(parallel=True, cache=True)
+def _classify_amplitudes(real, imag, tol, frac, out):
+    """
+    JIT-compiled classification of a state vector given as separate real/imag arrays,
+    writing one `AmplitudeKind` code per amplitude into `out`: exact constants first,
+    then real values (±FRAC_1_SQRT_2, integers, other floats) when the imaginary part
+    is below `tol`, else COMPLEX. Amplitudes are independent, so the loop is spread
+    across threads with `prange`.
+    """
+    for k in prange(real.shape[0]):
+        re, im = real[k], imag[k]
+        if im == 0.0 and re == 0.0: out[k] = AmplitudeKind.ZERO
+        elif im == 0.0 and re == 1.0: out[k] = AmplitudeKind.ONE
+        elif im == 0.0 and re == -1.0: out[k] = AmplitudeKind.NEG_ONE
+        elif re == 0.0 and im == 1.0: out[k] = AmplitudeKind.I
+        elif re == 0.0 and im == -1.0: out[k] = AmplitudeKind.NEG_I
+        elif not (abs(im) < tol): out[k] = AmplitudeKind.COMPLEX
+        # For finite values, same test as math.isclose(abs(re), frac, abs_tol=tol) with the default rel_tol
+        elif abs(abs(re) - frac) <= max(1e-9 * max(abs(re), frac), tol): out[k] = AmplitudeKind.REAL_FRAC
+        elif abs(re - np.round(re)) < tol: out[k] = AmplitudeKind.REAL_INT
+        else: out[k] = AmplitudeKind.REAL_FLOAT
+
 class RustVectorGenerator:
     TOLERANCE, TESTS_SUFFIX, INDENT = 1e-10, '_TESTS', "    "
+    # Total amplitudes across all groups above which groups are generated in parallel
+    PARALLEL_MIN_AMPLITUDES = 1 << 16
+    # id(test group) -> (test group, arg keys), shared across generator runs
+    _arg_keys_cache: Dict[int, Tuple[TestGroup, Optional[frozenset]]] = {}
     
     def __init__(self, vectors_module):
         self.vectors_module = vectors_module
@@ -31,44 +73,72 @@ class RustVectorGenerator:
         # This will store mappings like:
         # 'PHASE_TESTS' -> ('PhaseArgs', frozenset({'fraction'}))
         self.group_to_arg_struct_info = {}
+        # Rust literals for the exact constants, keyed by their `AmplitudeKind` code
+        self._fast_const = {
+            AmplitudeKind.ZERO: f"{self.c.COMPLEX64}::{self.c.ZERO}",
+            AmplitudeKind.ONE: f"{self.c.COMPLEX64}::{self.c.ONE}",
+            AmplitudeKind.NEG_ONE: f"-{self.c.COMPLEX64}::{self.c.ONE}",
+            AmplitudeKind.I: f"{self.c.COMPLEX64}::{self.c.I}",
+            AmplitudeKind.NEG_I: f"-{self.c.COMPLEX64}::{self.c.I}",
+        }
 
-    # --- Formatting helpers (unchanged) ---
-    def _is_close_to_zero(self, value: float) -> bool: return abs(value) < self.TOLERANCE
-    def _is_close_to_frac(self, value: float) -> bool: return math.isclose(abs(value), self.frac_1_sqrt_2, abs_tol=self.TOLERANCE)
-    def _is_integer(self, value: float) -> bool: return abs(value - round(value)) < self.TOLERANCE
-    def _format_number_as_rust(self, num: Union[int, float, complex]) -> str:
-        c = complex(num)
-        match c:
-            case 0+0j: return f"{self.c.COMPLEX64}::{self.c.ZERO}"
-            case 1+0j: return f"{self.c.COMPLEX64}::{self.c.ONE}"
-            case -1+0j: return f"-{self.c.COMPLEX64}::{self.c.ONE}"
-            case 0+1j: return f"{self.c.COMPLEX64}::{self.c.I}"
-            case 0-1j: return f"-{self.c.COMPLEX64}::{self.c.I}"
-        if self._is_close_to_zero(c.imag): return self._format_real_number(c.real)
-        return self._format_complex_number(c)
-    def _format_real_number(self, real: float) -> str:
-        if self._is_close_to_frac(real):
-            sign = "" if real > 0 else "-"
-            return f"{self.c.COMPLEX64}::{self.c.FROM}({sign}{self.c.FRAC_1_SQRT_2})"
-        if self._is_integer(real): return f"{self.c.COMPLEX64}::{self.c.FROM}({int(round(real))}.0)"
-        return f"{self.c.COMPLEX64}::{self.c.FROM}({real})"
+    def __getstate__(self):
+        # Modules can't be pickled; worker processes only need the prepared arg-struct info.
+        state = self.__dict__.copy()
+        state['vectors_module'] = None
+        return state
+
+    # --- Formatting helpers ---
+    # Pure functions of their arguments, memoized: most amplitudes are one of a few constants.
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def _is_close_to_frac(value: float, frac: float, tol: float = TOLERANCE) -> bool: return math.isclose(abs(value), frac, abs_tol=tol)
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def _is_integer(value: float, tol: float = TOLERANCE) -> bool: return abs(value - round(value)) < tol
     def _format_complex_number(self, c: complex) -> str:
-        real_str = self._format_component(c.real)
-        imag_str = self._format_component(c.imag)
+        real_str = self._format_component(c.real, self.frac_1_sqrt_2)
+        imag_str = self._format_component(c.imag, self.frac_1_sqrt_2)
         return f"{self.c.COMPLEX64}::{self.c.NEW}({real_str}, {imag_str})"
-    def _format_component(self, value: float) -> str:
-        if self._is_close_to_frac(value):
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def _format_component(value: float, frac: float) -> str:
+        # Keyed on the exact value: str(value) is emitted verbatim, so rounding the key would change the output
+        if RustVectorGenerator._is_close_to_frac(value, frac):
             sign = "" if value > 0 else "-"
-            return f"{sign}{self.c.FRAC_1_SQRT_2}"
-        if self._is_integer(value): return f"{int(round(value))}.0"
+            return f"{sign}{RustConstants.FRAC_1_SQRT_2}"
+        if RustVectorGenerator._is_integer(value): return f"{int(round(value))}.0"
         return str(value)
     def _format_state_vector(self, state_vector: List[complex], indent_level: int) -> str:
-        if not state_vector: return "vec![]"
+        if len(state_vector) == 0: return "vec![]"
         if len(state_vector) & (len(state_vector) - 1) != 0: raise ValueError(f"State vector length {len(state_vector)} is not a power of 2")
         base_indent = self.INDENT * indent_level
         n_qubits = int(math.log2(len(state_vector)))
-        lines = [f"{base_indent}{self.INDENT}{self._format_number_as_rust(amp)}, // |{i:0{n_qubits}b}⟩" for i, amp in enumerate(state_vector)]
-        return "vec![\n" + "\n".join(lines) + f"\n{base_indent}]"
+        amplitudes = np.asarray(state_vector, dtype=complex)
+        if not np.isfinite(amplitudes).all(): raise ValueError("State vector contains non-finite amplitudes")
+        real, imag = np.ascontiguousarray(amplitudes.real), np.ascontiguousarray(amplitudes.imag)
+        codes = np.empty(len(amplitudes), dtype=np.uint8)
+        _classify_amplitudes(real, imag, self.TOLERANCE, self.frac_1_sqrt_2, codes)
+        items = [f"{self._format_classified(code, re, im)}," for code, re, im in zip(codes.tolist(), real.tolist(), imag.tolist())]
+        # rustfmt aligns the trailing comments of a list to its widest item
+        width = max(map(len, items))
+        buf = io.StringIO()
+        buf.write("vec![\n")
+        for i, item in enumerate(items):
+            buf.write(f"{base_indent}{self.INDENT}{item:<{width}} // |{i:0{n_qubits}b}⟩\n")
+        buf.write(f"{base_indent}]")
+        return buf.getvalue()
+    def _format_classified(self, code: int, real: float, imag: float) -> str:
+        """Renders an amplitude already classified by `_classify_amplitudes`."""
+        hit = self._fast_const.get(code)
+        if hit is not None: return hit
+        match code:
+            case AmplitudeKind.REAL_FRAC:
+                sign = "" if real > 0 else "-"
+                return f"{self.c.COMPLEX64}::{self.c.FROM}({sign}{self.c.FRAC_1_SQRT_2})"
+            case AmplitudeKind.REAL_INT: return f"{self.c.COMPLEX64}::{self.c.FROM}({int(round(real))}.0)"
+            case AmplitudeKind.REAL_FLOAT: return f"{self.c.COMPLEX64}::{self.c.FROM}({real})"
+        return self._format_complex_number(complex(real, imag))
 
     # --- Pass 1: Analyze and Prepare ---
     def _analyze_and_prepare_arg_structs(self):
@@ -78,18 +148,7 @@ class RustVectorGenerator:
         """
         all_test_sets = self._discover_test_sets()
         for group_name, test_data in all_test_sets:
-            # Find the first test case with args to define the structure for the whole group
-            arg_keys = None
-            for test_case in test_data:
-                args_dict = test_case.get('kwargs') or test_case.get('args')
-                if args_dict:
-                    current_keys = frozenset(k for k, v in args_dict.items() if isinstance(v, (int, float)))
-                    if current_keys:
-                        # Assumption: all arg structures within a group are the same.
-                        # We only need to find the first one.
-                        arg_keys = current_keys
-                        break
-            
+            arg_keys = self._find_arg_keys(test_data)
             if arg_keys:
                 # Generate a struct name from the group name, e.g., "PHASE_TESTS" -> "PhaseArgs"
                 base_name = group_name.replace(self.TESTS_SUFFIX, '').capitalize()
@@ -98,6 +157,27 @@ class RustVectorGenerator:
         
         print(f"Discovered {len(self.group_to_arg_struct_info)} test groups with custom arguments.")
 
+    @classmethod
+    def _find_arg_keys(cls, test_data: TestGroup) -> Optional[frozenset]:
+        """Returns the numeric arg keys of a group, scanning each group at most once."""
+        cached = cls._arg_keys_cache.get(id(test_data))
+        # The group is kept in the entry so its id can't be reused by another object.
+        if cached is not None and cached[0] is test_data:
+            return cached[1]
+
+        # Find the first test case with args to define the structure for the whole group
+        arg_keys = None
+        for args_dict in test_data.args:
+            if args_dict:
+                current_keys = frozenset(k for k, v in args_dict.items() if isinstance(v, (int, float)))
+                if current_keys:
+                    # Assumption: all arg structures within a group are the same.
+                    # We only need to find the first one.
+                    arg_keys = current_keys
+                    break
+        cls._arg_keys_cache[id(test_data)] = (test_data, arg_keys)
+        return arg_keys
+
     # --- Pass 2: Generation ---
     def _get_arg_type_and_value(self, group_name: str, args_dict: Optional[Dict]) -> Tuple[str, str]:
         """Determines the Rust type and value literal for a given test case."""
@@ -116,42 +196,38 @@ class RustVectorGenerator:
         
         return struct_name, value_literal
 
-    def _generate_rust_variable(self, group_name: str, test_cases: List[Dict]) -> str:
+    def _generate_rust_variable(self, group_name: str, test_group: TestGroup) -> str:
         """Generates a Rust variable for a single group of tests."""
-        first_case = test_cases[0]
-        args_dict = first_case.get('kwargs') or first_case.get('args')
-        arg_type, _ = self._get_arg_type_and_value(group_name, args_dict)
+        arg_type, _ = self._get_arg_type_and_value(group_name, test_group.args[0])
     
-        lines = [
-            f"pub(crate) static {group_name}: LazyLock<Vec<TestVector<{arg_type}>>> = LazyLock::new(|| {{",
-            f"{self.INDENT}vec!["
-        ]
+        buf = io.StringIO()
+        buf.write(
+            f"pub(crate) static {group_name}: LazyLock<Vec<TestVector<{arg_type}>>> = LazyLock::new(|| {{\n"
+            f"{self.INDENT}vec![\n"
+        )
     
-        for test_case in test_cases:
-            description = test_case['description'].replace('"', '\\"')
-            current_args_dict = test_case.get('kwargs') or test_case.get('args')
-            _, rust_arg_value = self._get_arg_type_and_value(group_name, current_args_dict)
+        indent_level = 3
+        indent_str = self.INDENT * indent_level
+        for case_id in range(len(test_group)):
+            description = test_group.descriptions[case_id].replace('"', '\\"')
+            _, rust_arg_value = self._get_arg_type_and_value(group_name, test_group.args[case_id])
+            num_controls = test_group.num_controls[case_id]
+            rust_num_controls = f"Some({num_controls})" if num_controls is not None else "None"
 
-            lines.append(f"{self.INDENT*2}// {description}")
-            lines.append(f"{self.INDENT*2}TestVector {{")
-        
-            indent_level = 3
-            indent_str = self.INDENT * indent_level
-        
-            # This list of extend calls now contains the corrected line for 'qubits'
-            lines.extend([
-                f'{indent_str}description: "{description}",',
-                # --- THIS IS THE CORRECTED LINE ---
-                f"{indent_str}qubits: vec!{str(test_case['qubits'])},",
-                f"{indent_str}num_controls: {'Some({})'.format(test_case.get('num_controls')) if test_case.get('num_controls') is not None else 'None'},",
-                f"{indent_str}args: {rust_arg_value},",
-                f"{indent_str}initial_state: {self._format_state_vector(test_case['initial_state'], indent_level)},",
-                f"{indent_str}expected_state: {self._format_state_vector(test_case['expected_state'], indent_level)},"
-            ])
-            lines.append(f"{self.INDENT*2}}},")
+            buf.write(
+                f"{self.INDENT*2}// {description}\n"
+                f"{self.INDENT*2}TestVector {{\n"
+                f'{indent_str}description: "{description}",\n'
+                f"{indent_str}qubits: vec!{str(test_group.qubits[case_id])},\n"
+                f"{indent_str}num_controls: {rust_num_controls},\n"
+                f"{indent_str}args: {rust_arg_value},\n"
+                f"{indent_str}initial_state: {self._format_state_vector(test_group.initial_state(case_id), indent_level)},\n"
+                f"{indent_str}expected_state: {self._format_state_vector(test_group.expected_state(case_id), indent_level)},\n"
+                f"{self.INDENT*2}}},\n"
+            )
 
-        lines.extend([f"{self.INDENT}]", "});"])
-        return "\n".join(lines)
+        buf.write(f"{self.INDENT}]\n}});")
+        return buf.getvalue()
 
     def _generate_file_header(self) -> List[str]:
         """Generates the file header, including the dynamically created arg structs."""
@@ -159,8 +235,8 @@ class RustVectorGenerator:
             "// This file is auto-generated by a Python script. Do not edit manually.",
             "// It uses a generic TestVector<T> struct and domain-based arg structs.",
             "",
-            "use std::{f64::consts::FRAC_1_SQRT_2, sync::LazyLock, vec, vec::Vec};",
             "use num_complex::Complex64;",
+            "use std::{f64::consts::FRAC_1_SQRT_2, sync::LazyLock, vec, vec::Vec};",
             "",
             "// --- Argument Structs (Auto-generated from test groups) ---",
         ]
@@ -198,65 +274,103 @@ class RustVectorGenerator:
         ])
         return header
 
-    def _discover_test_sets(self) -> List[Tuple[str, List[Dict]]]:
+    def _discover_test_sets(self) -> List[Tuple[str, TestGroup]]:
         """Discovers all test data sets from the vectors module."""
         test_sets = []
         for attr_name in sorted(dir(self.vectors_module)):
             if attr_name.endswith(self.TESTS_SUFFIX) and not attr_name.startswith('__'):
                 test_data = getattr(self.vectors_module, attr_name)
-                if isinstance(test_data, list) and test_data:
+                if isinstance(test_data, TestGroup) and len(test_data):
                     test_sets.append((attr_name, test_data))
         return test_sets
 
-    def generate_rust_code(self) -> str:
-        """Main generation orchestrator."""
+    def generate_rust_code(self) -> Iterator[str]:
+        """
+        Main generation orchestrator. Yields the Rust source in chunks (the header,
+        then one chunk per test group) so it can be streamed to disk.
+        """
         self._analyze_and_prepare_arg_structs()
         
-        rust_file_content = self._generate_file_header()
+        yield "\n".join(self._generate_file_header())
         
         all_test_sets = self._discover_test_sets()
         print(f"Generating {len(all_test_sets)} Rust static variables.")
 
-        for group_name, test_data in all_test_sets:
-            try:
-                # Unlike the previous version, we don't need to group. Each Python
-                # list corresponds to exactly one Rust static variable.
-                rust_code_block = self._generate_rust_variable(group_name, test_data)
-                rust_file_content.append(rust_code_block)
-                rust_file_content.append("")
-                
-                arg_type, _ = self._get_arg_type_and_value(group_name, (test_data[0].get('kwargs') or test_data[0].get('args')))
-                print(f"  ✓ Generated {group_name}<{arg_type}> with {len(test_data)} cases")
-            except Exception as e:
-                print(f"  ✗ Error generating {group_name}: {e}", file=sys.stderr)
-                raise
-        
-        return "\n".join(rust_file_content)
+        # Groups are independent, so large inputs are formatted in worker processes; below
+        # the threshold, process startup costs more than it saves. Results are collected
+        # in submission order to keep the output deterministic.
+        total_amplitudes = sum(len(test_data.initial) + len(test_data.expected) for _, test_data in all_test_sets)
+        with contextlib.ExitStack() as stack:
+            if len(all_test_sets) > 1 and total_amplitudes >= self.PARALLEL_MIN_AMPLITUDES:
+                executor = stack.enter_context(
+                    ProcessPoolExecutor(max_workers=min(os.cpu_count() or 1, len(all_test_sets)))
+                )
+                futures = [
+                    executor.submit(self._generate_rust_variable, group_name, test_data)
+                    for group_name, test_data in all_test_sets
+                ]
+                rust_code_blocks = (future.result() for future in futures)
+            else:
+                rust_code_blocks = (
+                    self._generate_rust_variable(group_name, test_data)
+                    for group_name, test_data in all_test_sets
+                )
+            for group_name, test_data in all_test_sets:
+                try:
+                    # Unlike the previous version, we don't need to group. Each Python
+                    # list corresponds to exactly one Rust static variable.
+                    rust_code_block = next(rust_code_blocks)
+                    
+                    arg_type, _ = self._get_arg_type_and_value(group_name, test_data.args[0])
+                    print(f"  ✓ Generated {group_name}<{arg_type}> with {len(test_data)} cases")
+                except Exception as e:
+                    print(f"  ✗ Error generating {group_name}: {e}", file=sys.stderr)
+                    raise
+                # Each group is followed by a blank line
+                yield f"\n{rust_code_block}\n"
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Generate src/tests/vectors.rs from vectors.py.")
+    parser.add_argument(
+        "--fmt", action="store_true",
+        help="also run 'cargo fmt' on the generated file (the output is already rustfmt-clean)",
+    )
+    args = parser.parse_args()
+
     print("Generating Rust test vectors from vectors.py (domain-based generic struct mode)")
     try:
         generator = RustVectorGenerator(vectors)
-        generated_rust_code = generator.generate_rust_code()
         
         script_dir = Path(__file__).parent
         output_path = script_dir.parent / "src" / "tests" / "vectors.rs"
+        
+        # Stream the chunks to a temp file rather than building the whole file in memory,
+        # and only replace the existing output once generation has fully succeeded.
+        tmp_path = output_path.with_suffix('.rs.tmp')
+        try:
+            with tmp_path.open('wb') as f:
+                for chunk in generator.generate_rust_code():
+                    f.write(chunk.encode('utf-8'))
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        
         if output_path.exists():
             backup_path = output_path.with_suffix('.rs.bak')
             output_path.rename(backup_path)
-        
-        output_path.write_text(generated_rust_code, encoding='utf-8')
+        os.replace(tmp_path, output_path)
         print(f"✓ Successfully saved to {output_path}")
 
-        print("Formatting the generated file with 'cargo fmt'...")
-        subprocess.run(
-            ["cargo", "fmt", "--", str(output_path)],
-            check=True,
-            capture_output=True, # Captures stdout/stderr for better error messages
-            text=True
-        )
-        print("✓ Formatting successful.")
+        if args.fmt:
+            print("Formatting the generated file with 'cargo fmt'...")
+            subprocess.run(
+                ["cargo", "fmt", "--", str(output_path)],
+                check=True,
+                capture_output=True, # Captures stdout/stderr for better error messages
+                text=True
+            )
+            print("✓ Formatting successful.")
         
     except ImportError as e:
         print(f"✗ Error: Could not import 'vectors' module. Ensure 'vectors.py' is in the same directory.", file=sys.stderr)
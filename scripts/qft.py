@@ -1,3 +1,5 @@
+import functools
+
 from qiskit import QuantumCircuit
 import numpy as np
 
@@ -8,6 +10,8 @@ def QFT(num_qubits: int,
     Return an n-qubit QFT (or inverse QFT) gate that matches the
     textbook/Qiskit definition (little-endian; bit-reversal built in).
 
+    Circuits are built once per parameter set; callers get a fresh copy.
+
     Parameters
     ----------
     num_qubits : int
@@ -16,13 +20,20 @@ def QFT(num_qubits: int,
     do_swaps : bool, optional
         Insert the final bit-reversal SWAP network (default: True).
     """
+    return _build_qft(num_qubits, inverse, do_swaps).copy()
+
+@functools.lru_cache(maxsize=32)
+def _build_qft(num_qubits: int, inverse: bool, do_swaps: bool):
     qc = QuantumCircuit(num_qubits, name="qft")
 
+    # π / 2^{distance} for distance = 1 … n
+    angles = np.pi * 2.0 ** -np.arange(1, num_qubits + 1)
+
     # *** 1. phase-ladder from MSB → LSB ***
     for i in reversed(range(num_qubits)):         # i = n-1 … 0
         qc.h(i)
         for j in range(i):                        # j = 0 … i-1
-            angle = np.pi / (2 ** (i - j))        # π / 2^{distance}
+            angle = angles[i - j - 1]             # π / 2^{i-j}
             qc.cp(angle, i, j)                    # control=i target=j
 
     # *** 2. optional bit-reversal SWAPs ***
@@ -3,44 +3,53 @@ import pytest
 
 from qiskit.circuit.library import QFTGate as QiskitQFT
 from qft import QFT as LocalQFT
-import vectors
+from _vectors_cache import vectors
 
 # --- Standard Gate Tests ---
 
-@pytest.mark.parametrize("test_vector", vectors.HADAMARD_TESTS)
-def test_hadamard(test_runner, test_vector):
+@pytest.mark.parametrize("case_id", range(len(vectors.HADAMARD_TESTS)))
+def test_hadamard(test_runner, case_id):
     gate_builder = lambda qc, v: qc.h(*v['qubits'])
-    test_runner(gate_builder, test_vector)
+    gate_builder._numpy_gate = 'h'
+    test_runner(gate_builder, vectors.HADAMARD_TESTS, case_id)
 
-@pytest.mark.parametrize("test_vector", vectors.NOT_TESTS)
-def test_not(test_runner, test_vector):
+@pytest.mark.parametrize("case_id", range(len(vectors.NOT_TESTS)))
+def test_not(test_runner, case_id):
     gate_builder = lambda qc, v: qc.x(*v['qubits'])
-    test_runner(gate_builder, test_vector)
+    gate_builder._numpy_gate = 'x'
+    test_runner(gate_builder, vectors.NOT_TESTS, case_id)
 
-@pytest.mark.parametrize("test_vector", vectors.PHASE_TESTS)
-def test_phase(test_runner, test_vector):
-    gate_builder = lambda qc, v: qc.p(2 * math.pi * v['args']['fraction'], *v['qubits'])
-    test_runner(gate_builder, test_vector)
+@pytest.mark.parametrize("case_id", range(len(vectors.PHASE_TESTS)))
+def test_phase(test_runner, case_id):
+    angle = lambda v: 2 * math.pi * v['args']['fraction']
+    gate_builder = lambda qc, v: qc.p(angle(v), *v['qubits'])
+    gate_builder._numpy_gate = 'p'
+    gate_builder._numpy_params = lambda v: (angle(v),)
+    test_runner(gate_builder, vectors.PHASE_TESTS, case_id)
 
-@pytest.mark.parametrize("test_vector", vectors.SWAP_TESTS)
-def test_swap(test_runner, test_vector):
+@pytest.mark.parametrize("case_id", range(len(vectors.SWAP_TESTS)))
+def test_swap(test_runner, case_id):
     gate_builder = lambda qc, v: qc.swap(*v['qubits'])
-    test_runner(gate_builder, test_vector)
+    gate_builder._numpy_gate = 'swap'
+    test_runner(gate_builder, vectors.SWAP_TESTS, case_id)
 
-@pytest.mark.parametrize("test_vector", vectors.CNOT_TESTS)
-def test_cnot(test_runner, test_vector):
+@pytest.mark.parametrize("case_id", range(len(vectors.CNOT_TESTS)))
+def test_cnot(test_runner, case_id):
     gate_builder = lambda qc, v: qc.cx(*v['qubits'])
-    test_runner(gate_builder, test_vector)
+    gate_builder._numpy_gate = 'cx'
+    test_runner(gate_builder, vectors.CNOT_TESTS, case_id)
 
-@pytest.mark.parametrize("test_vector", vectors.TOFFOLI_TESTS)
-def test_toffoli(test_runner, test_vector):
+@pytest.mark.parametrize("case_id", range(len(vectors.TOFFOLI_TESTS)))
+def test_toffoli(test_runner, case_id):
     gate_builder = lambda qc, v: qc.ccx(*v['qubits'])
-    test_runner(gate_builder, test_vector)
+    gate_builder._numpy_gate = 'ccx'
+    test_runner(gate_builder, vectors.TOFFOLI_TESTS, case_id)
 
-@pytest.mark.parametrize("test_vector", vectors.FREDKIN_TESTS)
-def test_fredkin(test_runner, test_vector):
+@pytest.mark.parametrize("case_id", range(len(vectors.FREDKIN_TESTS)))
+def test_fredkin(test_runner, case_id):
     gate_builder = lambda qc, v: qc.cswap(*v['qubits'])
-    test_runner(gate_builder, test_vector)
+    gate_builder._numpy_gate = 'cswap'
+    test_runner(gate_builder, vectors.FREDKIN_TESTS, case_id)
 
 # --- QFT Testing ---
 
@@ -49,25 +58,39 @@ def qft_implementation(request):
     """Fixture to test both Qiskit's and the local QFT implementation."""
     return request.param
 
-all_qft_tests = (
-    vectors.QFT_TESTS +
-    vectors.CQFT_TESTS +
-    vectors.CCQFT1_TESTS +
-    vectors.CCQFT2_TESTS
-)
+qft_groups = {
+    'QFT': vectors.QFT_TESTS,
+    'CQFT': vectors.CQFT_TESTS,
+    'CCQFT1': vectors.CCQFT1_TESTS,
+    'CCQFT2': vectors.CCQFT2_TESTS,
+}
+all_qft_tests = [
+    pytest.param(group, case_id, id=f"{name}-{case_id}")
+    for name, group in qft_groups.items()
+    for case_id in range(len(group))
+]
 
-@pytest.mark.parametrize("test_vector", all_qft_tests)
-def test_qft(test_runner, qft_implementation, test_vector):
+# Controlled QFT gates, keyed by (implementation name, QFT qubits, controls)
+_controlled_qft_cache = {}
+
+@pytest.mark.parametrize("test_group, case_id", all_qft_tests)
+def test_qft(test_runner, qft_implementation, test_group, case_id):
     def gate_builder(qc, v):
         num_controls = v.get('num_controls')
         n_qft_qubits = qc.num_qubits if num_controls is None else qc.num_qubits - num_controls
         
-        # The standard QiskitQFT and our LocalQFT both return Gate objects
-        qft_gate = qft_implementation(num_qubits=n_qft_qubits)
-        
-        if num_controls is not None:
-            qft_gate = qft_gate.control(num_controls)
+        if num_controls is None:
+            # The standard QiskitQFT and our LocalQFT both return Gate objects
+            qft_gate = qft_implementation(num_qubits=n_qft_qubits)
+        else:
+            key = (qft_implementation.__name__, n_qft_qubits, num_controls)
+            qft_gate = _controlled_qft_cache.get(key)
+            if qft_gate is None:
+                qft_gate = qft_implementation(num_qubits=n_qft_qubits).control(num_controls)
+                _controlled_qft_cache[key] = qft_gate
         
         qc.append(qft_gate, v['qubits'])
 
-    test_runner(gate_builder, test_vector)
+    # Besides the hand-written expected state, check the simulation against np.fft
+    gate_builder._qft_reference = True
+    test_runner(gate_builder, test_group, case_id)
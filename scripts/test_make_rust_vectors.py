@@ -0,0 +1,11 @@
+import vectors
+from make_rust_vectors import RustVectorGenerator
+
+def test_parallel_generation_matches_serial(monkeypatch):
+    serial = ''.join(RustVectorGenerator(vectors).generate_rust_code())
+
+    # Force the process-pool branch regardless of the amount of test data
+    monkeypatch.setattr(RustVectorGenerator, 'PARALLEL_MIN_AMPLITUDES', 0)
+    parallel = ''.join(RustVectorGenerator(vectors).generate_rust_code())
+
+    assert parallel == serial
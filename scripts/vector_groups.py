@@ -0,0 +1,69 @@
+"""
+Struct-of-arrays container for a group of gate test vectors.
+
+Test cases are authored in 'vectors.py' as one dict per case. `TestGroup`
+stores the same data column-wise: one list per scalar field and a single flat
+complex array per state, with per-case `offsets` (groups may mix state
+lengths, e.g. 2-, 3- and 4-qubit QFT cases). Per-case dicts are only built
+on demand.
+"""
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import numpy as np
+
+@dataclass(frozen=True)
+class TestGroup:
+    descriptions: List[str]
+    qubits: List[List[int]]
+    num_controls: List[Optional[int]]
+    args: List[Optional[Dict]]
+    offsets: np.ndarray   # int64[M + 1]; case k spans offsets[k]:offsets[k + 1]
+    initial: np.ndarray   # complex128, all initial states concatenated
+    expected: np.ndarray  # complex128, all expected states concatenated
+
+    @classmethod
+    def from_cases(cls, cases: List[Dict]) -> "TestGroup":
+        """Builds a group from a list of per-case dicts as written in 'vectors.py'."""
+        initial = [np.asarray(case['initial_state'], dtype=complex).ravel() for case in cases]
+        expected = [np.asarray(case['expected_state'], dtype=complex).ravel() for case in cases]
+        for case, a, b in zip(cases, initial, expected):
+            if len(a) != len(b):
+                raise ValueError(f"State length mismatch in test case '{case['description']}'")
+        offsets = np.zeros(len(cases) + 1, dtype=np.int64)
+        np.cumsum([len(a) for a in initial], out=offsets[1:])
+        return cls(
+            descriptions=[case['description'] for case in cases],
+            qubits=[list(case['qubits']) for case in cases],
+            num_controls=[case.get('num_controls') for case in cases],
+            args=[case.get('kwargs') or case.get('args') for case in cases],
+            offsets=offsets,
+            initial=np.concatenate(initial) if cases else np.empty(0, dtype=complex),
+            expected=np.concatenate(expected) if cases else np.empty(0, dtype=complex),
+        )
+
+    def __len__(self) -> int:
+        return len(self.descriptions)
+
+    def initial_state(self, case_id: int) -> np.ndarray:
+        return self.initial[self.offsets[case_id]:self.offsets[case_id + 1]]
+
+    def expected_state(self, case_id: int) -> np.ndarray:
+        return self.expected[self.offsets[case_id]:self.offsets[case_id + 1]]
+
+    def __getitem__(self, case_id: int) -> Dict:
+        """Materializes a single test case in the per-case dict layout."""
+        case = {
+            'description': self.descriptions[case_id],
+            'qubits': self.qubits[case_id],
+            'initial_state': self.initial_state(case_id),
+            'expected_state': self.expected_state(case_id),
+        }
+        if self.num_controls[case_id] is not None:
+            case['num_controls'] = self.num_controls[case_id]
+        if self.args[case_id] is not None:
+            case['args'] = self.args[case_id]
+        return case
+
+    def __iter__(self):
+        return (self[k] for k in range(len(self)))
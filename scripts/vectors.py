@@ -1,12 +1,22 @@
 import math
 import numpy as np
 
+from vector_groups import TestGroup
+
 FRAC_1_SQRT_2 = 1/math.sqrt(2)
 
 def normalize(v):
-    return (v / np.linalg.norm(v)).tolist()
+    """Returns `v` scaled to unit norm as a complex ndarray."""
+    v = np.asarray(v, dtype=complex)
+    return v / np.linalg.norm(v)
+
+def sparse_state(n, indices, values):
+    """Returns a length-n complex state with `values` at `indices` and zeros elsewhere."""
+    v = np.zeros(n, dtype=complex)
+    v[indices] = values
+    return v
 
-HADAMARD_TESTS = [
+HADAMARD_TESTS = TestGroup.from_cases([
     {
         'description': '|0⟩ → (|0⟩ + |1⟩)/sqrt(2)',
         'qubits': [0],
@@ -25,9 +35,9 @@ HADAMARD_TESTS = [
         'initial_state': [FRAC_1_SQRT_2, FRAC_1_SQRT_2],
         'expected_state': [1, 0],
     },
-]
+])
 
-NOT_TESTS = [
+NOT_TESTS = TestGroup.from_cases([
     {
         'description': '|0⟩ → |1⟩',
         'qubits': [0],
@@ -46,9 +56,9 @@ NOT_TESTS = [
         'initial_state': [FRAC_1_SQRT_2, FRAC_1_SQRT_2],
         'expected_state': [FRAC_1_SQRT_2, FRAC_1_SQRT_2],
     },
-]
+])
 
-PHASE_TESTS = [
+PHASE_TESTS = TestGroup.from_cases([
     {
         'description': 'Phase shift by π/2 on |1⟩ → i|1⟩',
         'qubits': [0],
@@ -77,9 +87,9 @@ PHASE_TESTS = [
         'expected_state': [0, (1 + 1j)*FRAC_1_SQRT_2],
         'args': {'fraction': 0.125},
     },
-]
+])
 
-SWAP_TESTS = [
+SWAP_TESTS = TestGroup.from_cases([
     {
         'description': '|01⟩ → |10⟩',
         'qubits': [0, 1],
@@ -98,9 +108,9 @@ SWAP_TESTS = [
         'initial_state': [0, FRAC_1_SQRT_2, FRAC_1_SQRT_2, 0],
         'expected_state': [0, FRAC_1_SQRT_2, FRAC_1_SQRT_2, 0],
     },
-]
+])
 
-CNOT_TESTS = [
+CNOT_TESTS = TestGroup.from_cases([
     {
         'description': '|10⟩ → |11⟩',
         'qubits': [1, 0],
@@ -131,9 +141,9 @@ CNOT_TESTS = [
         'initial_state': [1, 0, 0, 0],
         'expected_state': [1, 0, 0, 0],
     },
-]
+])
 
-TOFFOLI_TESTS = [
+TOFFOLI_TESTS = TestGroup.from_cases([
     {
         'description': '|110⟩ → |111⟩',
         'qubits': [1, 2, 0],
@@ -152,9 +162,9 @@ TOFFOLI_TESTS = [
         'initial_state': [0, 0, 0, 0, 0, 0, FRAC_1_SQRT_2, FRAC_1_SQRT_2],
         'expected_state': [0, 0, 0, 0, 0, 0, FRAC_1_SQRT_2, FRAC_1_SQRT_2],
     },
-]
+])
 
-FREDKIN_TESTS = [
+FREDKIN_TESTS = TestGroup.from_cases([
     {
         'description': '|000⟩ → |000⟩ (No Swap)',
         'qubits': [2, 0, 1],
@@ -179,111 +189,103 @@ FREDKIN_TESTS = [
         'initial_state': [0, 0, 0, 0, 0, FRAC_1_SQRT_2, FRAC_1_SQRT_2, 0],
         'expected_state': [0, 0, 0, 0, 0, FRAC_1_SQRT_2, FRAC_1_SQRT_2, 0],
     },
-]
+])
 
-QFT_TESTS = [
+QFT_TESTS = TestGroup.from_cases([
     {
         'description': '|0⟩ + |2⟩ → |0⟩ + |2⟩',
         'qubits': [0, 1],
-        'initial_state': [FRAC_1_SQRT_2 if i in [0, 2] else 0.0 for i in range(4)],
-        'expected_state': [FRAC_1_SQRT_2 if i in [0, 2] else 0.0 for i in range(4)],
+        'initial_state': sparse_state(4, [0, 2], FRAC_1_SQRT_2),
+        'expected_state': sparse_state(4, [0, 2], FRAC_1_SQRT_2),
     },
     {
         'description': '|0⟩ + |2⟩ + |4⟩ + |6⟩ → |0⟩ + |4⟩',
         'qubits': [0, 1, 2],
-        'initial_state': [0.5 if i in [0, 2, 4, 6] else 0.0 for i in range(8)],
-        'expected_state': [FRAC_1_SQRT_2 if i in [0, 4] else 0.0 for i in range(8)],
+        'initial_state': sparse_state(8, [0, 2, 4, 6], 0.5),
+        'expected_state': sparse_state(8, [0, 4], FRAC_1_SQRT_2),
     },
     {
         'description': '|1⟩ + |5⟩ + |9⟩ + |13⟩ → |0⟩ + |4⟩ + |8⟩ + |12⟩',
         'qubits': [0, 1, 2, 3],
-        'initial_state': [0.5 if i in [1, 5, 9, 13] else 0.0 for i in range(16)],
-        'expected_state': [0.5 * np.exp(2j * math.pi * i / 16) if i % 4 == 0 else 0 for i in range(16)]
+        'initial_state': sparse_state(16, [1, 5, 9, 13], 0.5),
+        'expected_state': 0.5 * np.exp(2j * np.pi * np.arange(16) / 16) * (np.arange(16) % 4 == 0),
     },
-]
+])
 
-CQFT_TESTS = [
+CQFT_TESTS = TestGroup.from_cases([
     {
         'description': 'Controlled-QFT',
         'qubits': [2, 0, 1],
         'num_controls': 1,
-        'initial_state': normalize([1 if i in [0, 5] else 0.0 for i in range(8)]),
+        'initial_state': normalize(sparse_state(8, [0, 5], 1)),
         'expected_state': normalize([1, 0, 0, 0, 0.5, 0.5j, -0.5, -0.5j])
         #'expected_state': normalize([1, 0.5, 0, -0.5, 0, 0.5, 0, -0.5])
     },
-]
+])
 
-CCQFT1_TESTS = [
+CCQFT1_TESTS = TestGroup.from_cases([
     {
         'description': 'CC-QFT: Controls not met (|0110> -> |0110>)',
         'qubits': [3, 2, 0, 1],
         'num_controls': 2,
-        'initial_state': [1 if i == 6 else 0.0 for i in range(16)], # |0110>
-        'expected_state': [1 if i == 6 else 0.0 for i in range(16)], # |0110>
+        'initial_state': sparse_state(16, [6], 1), # |0110>
+        'expected_state': sparse_state(16, [6], 1), # |0110>
     },
     {
         'description': 'CC-QFT: Controls met (|1101> -> QFT|01>)',
         'qubits': [3, 2, 0, 1],
         'num_controls': 2,
-        'initial_state': [1 if i == 13 else 0.0 for i in range(16)], # |1101>
-        'expected_state': [
-            0.5 if i == 12 else         # |1100>
-            0.5j if i == 13 else        # |1101>
-            -0.5 if i == 14 else        # |1110>
-            -0.5j if i == 15 else       # |1111>
-            0.0 for i in range(16)
-        ],
+        'initial_state': sparse_state(16, [13], 1), # |1101>
+        'expected_state': sparse_state(
+            16,
+            [12, 13, 14, 15],           # |1100>, |1101>, |1110>, |1111>
+            [0.5, 0.5j, -0.5, -0.5j],
+        ),
     },
     {
         'description': 'CC-QFT: Superposition of met and not-met controls',
         'qubits': [3, 2, 0, 1],
         'num_controls': 2,
         # Initial state is (|0110> + |1101>)/sqrt(2)
-        'initial_state': normalize([1 if i in [6, 13] else 0.0 for i in range(16)]),
+        'initial_state': normalize(sparse_state(16, [6, 13], 1)),
         # Expected state combines the results from test #1 and #2 via linearity
         'expected_state': normalize(
-            [
-                1.0 if i == 6 else          # from |0110> part
-                0.5 if i == 12 else         # from QFT(|1101>) part
-                0.5j if i == 13 else
-                -0.5 if i == 14 else
-                -0.5j if i == 15 else
-                0.0 for i in range(16)
-            ]
+            sparse_state(
+                16,
+                [6, 12, 13, 14, 15],
+                [1.0,                       # from |0110> part
+                 0.5, 0.5j, -0.5, -0.5j],   # from QFT(|1101>) part
+            )
         )
     },
-]
+])
 
-CCQFT2_TESTS = [
+CCQFT2_TESTS = TestGroup.from_cases([
     {
         'description': 'CC-QFT: Controls met (|1101> -> |11> (H|1> H|0>))',
         'qubits': [3, 2, 1, 0],
         'num_controls': 2,
-        'initial_state': [1 if i == 13 else 0.0 for i in range(16)], # |1101>
-        'expected_state': [
+        'initial_state': sparse_state(16, [13], 1), # |1101>
+        'expected_state': sparse_state(
+            16,
             # This matches your "Actual" output from the failed test
             # Amplitudes for |1100>, |1101>, |1110>, |1111>
-            0.5 if i == 12 else
-            0.5 if i == 13 else
-            -0.5 if i == 14 else
-            -0.5 if i == 15 else
-            0.0 for i in range(16)
-        ],
+            [12, 13, 14, 15],
+            [0.5, 0.5, -0.5, -0.5],
+        ),
     },
     {
         'description': 'CC-QFT: Superposition of met and not-met controls',
         'qubits': [3, 2, 1, 0],
         'num_controls': 2,
-        'initial_state': normalize([1 if i in [6, 13] else 0.0 for i in range(16)]), # (|0110> + |1101>)/sqrt(2)
+        'initial_state': normalize(sparse_state(16, [6, 13], 1)), # (|0110> + |1101>)/sqrt(2)
         'expected_state': normalize(
-            [
-                1.0 if i == 6 else          # from |0110> part
-                0.5 if i == 12 else         # from WHT(|1101>) part
-                0.5 if i == 13 else
-                -0.5 if i == 14 else
-                -0.5 if i == 15 else
-                0.0 for i in range(16)
-            ]
+            sparse_state(
+                16,
+                [6, 12, 13, 14, 15],
+                [1.0,                       # from |0110> part
+                 0.5, 0.5, -0.5, -0.5],     # from WHT(|1101>) part
+            )
         )
     },
-]
+])